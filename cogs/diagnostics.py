@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.profiling import Profiler, ProfilerError
+
+# Types whose instances tend to linger (long view/modal timeouts, unbounded
+# per-user dicts) and are worth counting in memory reports.
+TRACKED_TYPES = (
+    "VerificationView",
+    "EnterOTPView",
+    "IdentifierModal",
+    "OTPModal",
+    "OTPEntry",
+    "OTPStore",
+    "AttemptTracker",
+)
+
+
+class DiagnosticsCog(commands.Cog, name="DiagnosticsCog"):
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.profiler = Profiler(log_dir=os.path.join(base_dir, "logs"))
+
+    def _store_sizes(self) -> dict[str, int]:
+        cog = self.bot.get_cog("VerificationCog")
+        if cog is None:
+            return {}
+        return {
+            "OTPStore entries": len(cog.otp_store),
+            "AttemptTracker entries": len(cog.attempt_tracker),
+        }
+
+    @app_commands.command(name="profile_start", description="Start CPU profiling")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def profile_start(self, interaction: discord.Interaction) -> None:
+        try:
+            self.profiler.start_cpu()
+        except ProfilerError as exc:
+            await interaction.response.send_message(str(exc), ephemeral=True)
+            return
+        await interaction.response.send_message(
+            "CPU profiling started. Use /profile_stop to collect the report.",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="profile_stop", description="Stop CPU profiling and show the report")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def profile_stop(self, interaction: discord.Interaction) -> None:
+        try:
+            profile = self.profiler.stop_cpu()
+        except ProfilerError as exc:
+            await interaction.response.send_message(str(exc), ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        raw_path, summary_path = await asyncio.to_thread(self.profiler.write_cpu_report, profile)
+        await interaction.followup.send(
+            f"CPU profile saved to `{raw_path.name}`. Top functions attached.",
+            file=discord.File(summary_path),
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="memory_baseline", description="Start memory tracing and take a baseline snapshot")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def memory_baseline(self, interaction: discord.Interaction) -> None:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # Snapshots of a large traced heap take seconds; keep them off the loop.
+        await asyncio.to_thread(self.profiler.take_baseline)
+        await interaction.followup.send(
+            "Memory baseline taken. Use /memory_snapshot to compare against it.",
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="memory_snapshot", description="Compare memory against the baseline")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(stop="Stop memory tracing after this snapshot")
+    async def memory_snapshot(self, interaction: discord.Interaction, stop: bool = False) -> None:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            path = await asyncio.to_thread(
+                self.profiler.memory_report,
+                type_names=TRACKED_TYPES,
+                sizes=self._store_sizes(),
+                stop=stop,
+            )
+        except ProfilerError as exc:
+            await interaction.followup.send(str(exc), ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            "Memory report: top allocation sites and live object counts attached.",
+            file=discord.File(path),
+            ephemeral=True,
+        )
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(DiagnosticsCog(bot))
@@ -10,8 +10,8 @@ from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from utils.db_handler import DBHandler
-from utils.mailer import MailerError, send_otp_email
+from utils.db_handler import DBHandler, RosterDiff, RosterError
+from utils.mailer import MailerError, mask_email, send_otp_email
 from utils.name_utils import build_nickname
 from utils.otp_store import OTPStore
 from utils.verification_log import VerificationLog
@@ -39,6 +39,9 @@ class AttemptTracker:
     def __init__(self) -> None:
         self._attempts: dict[int, int] = {}
 
+    def __len__(self) -> int:
+        return len(self._attempts)
+
     def increment(self, user_id: int) -> int:
         self._attempts[user_id] = self._attempts.get(user_id, 0) + 1
         return self._attempts[user_id]
@@ -105,10 +108,12 @@ class IdentifierModal(discord.ui.Modal, title="Xác thực thành viên CLB USCC
         record = self._db.find_by_identifier(identifier_input)
         if record is None:
             print(f"[GAuth] Record not found for {identifier_input}")
-            await interaction.followup.send(
-                "Không tìm thấy thông tin. Hãy kiểm tra MSSV/Email.",
-                ephemeral=True,
-            )
+            message = "Không tìm thấy thông tin. Hãy kiểm tra MSSV/Email."
+            # Only masked emails are shown so a typo cannot reveal someone else's data.
+            hints = sorted({mask_email(r.email) for r in self._db.suggest(identifier_input) if r.email})
+            if hints:
+                message += "\nCó phải bạn muốn nhập email: " + ", ".join(hints) + "?"
+            await interaction.followup.send(message, ephemeral=True)
             return
         code = f"{random.randint(0, 999999):06d}"
         self._otp_store.set(
@@ -378,6 +383,60 @@ class VerificationView(discord.ui.View):
         )
 
 
+def _roster_diff_embed(diff: RosterDiff) -> discord.Embed:
+    embed = discord.Embed(
+        title="USCC Roster Import",
+        color=discord.Color.blue(),
+    )
+    embed.add_field(name="Added", value=str(len(diff.added)), inline=True)
+    embed.add_field(name="Removed", value=str(len(diff.removed)), inline=True)
+    embed.add_field(name="Changed", value=str(len(diff.changed)), inline=True)
+    embed.add_field(name="Unchanged", value=str(diff.unchanged), inline=True)
+
+    samples = (
+        [f"+ {r.full_name} ({r.mssv})" for r in diff.added[:5]]
+        + [f"- {r.full_name} ({r.mssv})" for _, r in diff.removed[:5]]
+        + [f"~ {new.full_name} ({new.mssv})" for _, _, new in diff.changed[:5]]
+    )
+    if samples:
+        embed.add_field(
+            name="Sample",
+            value="```" + "\n".join(samples)[:1000] + "```",
+            inline=False,
+        )
+    return embed
+
+
+class RosterImportView(discord.ui.View):
+    def __init__(self, *, cog: VerificationCog, diff: RosterDiff) -> None:
+        super().__init__(timeout=300)
+        self._cog = cog
+        self._diff = diff
+
+    @discord.ui.button(label="Apply", style=discord.ButtonStyle.success)
+    async def apply(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        self.stop()
+        await interaction.response.defer()
+        try:
+            await self._cog.apply_roster_diff(self._diff)
+        except (RosterError, OSError) as exc:
+            await interaction.edit_original_response(
+                content=f"Import failed, roster unchanged: {exc}",
+                view=None,
+            )
+            return
+
+        await interaction.edit_original_response(
+            content=f"Roster updated: {len(self._cog.db)} members.",
+            view=None,
+        )
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        self.stop()
+        await interaction.response.edit_message(content="Import cancelled.", embed=None, view=None)
+
+
 class VerificationCog(commands.Cog, name="VerificationCog"):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
@@ -389,6 +448,8 @@ class VerificationCog(commands.Cog, name="VerificationCog"):
         self.otp_store = OTPStore()
         self.verification_log = VerificationLog(log_dir=os.path.join(base_dir, "logs"))
         self.attempt_tracker = AttemptTracker()
+        # Serializes roster imports; lookups keep running while one is prepared.
+        self.roster_lock = asyncio.Lock()
 
         self.verified_role_id: Optional[int] = None
         self.verification_channel_id: Optional[int] = None
@@ -417,6 +478,13 @@ class VerificationCog(commands.Cog, name="VerificationCog"):
             max_attempts=self.max_attempts,
         ))
 
+    async def cog_load(self) -> None:
+        # Build the roster indexes off the event loop instead of on the first lookup.
+        try:
+            await asyncio.to_thread(self.db.load)
+        except FileNotFoundError as exc:
+            print(f"[GAuth] {exc}")
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
         if self.verification_channel_id is None:
@@ -514,6 +582,89 @@ class VerificationCog(commands.Cog, name="VerificationCog"):
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="member", description="Search the member roster by name, MSSV or email")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(query="Name (accents optional), MSSV or email")
+    async def member_search(self, interaction: discord.Interaction, query: str) -> None:
+        # Autocomplete choices carry the MSSV, so try an exact match first.
+        record = self.db.find_by_identifier(query)
+        records = [record] if record is not None else self.db.search_by_name(query, limit=10)
+
+        if not records:
+            await interaction.response.send_message("No member found.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="USCC Member Search",
+            color=discord.Color.blue(),
+        )
+        for r in records:
+            embed.add_field(
+                name=r.full_name or "?",
+                value=f"MSSV: {r.mssv or '?'}\nEmail: {r.email or '?'}",
+                inline=False,
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @member_search.autocomplete("query")
+    async def member_search_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        # Permission checks do not run for autocomplete; do not leak the roster.
+        if not interaction.permissions.administrator:
+            return []
+
+        return [
+            app_commands.Choice(name=f"{r.full_name} ({r.mssv})"[:100], value=r.mssv)
+            for r in self.db.search_by_name(current, limit=25)
+            if r.mssv
+        ]
+
+    @app_commands.command(name="roster_import", description="Update the member roster from a CSV file")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(file="CSV with name, MSSV, email columns (no header needed)")
+    async def roster_import(self, interaction: discord.Interaction, file: discord.Attachment) -> None:
+        if not file.filename.lower().endswith(".csv"):
+            await interaction.response.send_message("Please upload a .csv file.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        data = await file.read()
+        try:
+            async with self.roster_lock:
+                diff = await asyncio.to_thread(self.db.prepare_import, data)
+        except (RosterError, FileNotFoundError) as exc:
+            await interaction.followup.send(f"Import failed: {exc}", ephemeral=True)
+            return
+
+        if diff.empty:
+            await interaction.followup.send(
+                f"No changes: roster already matches ({diff.unchanged} members).",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.followup.send(
+            "Review the changes below, then apply them.",
+            embed=_roster_diff_embed(diff),
+            view=RosterImportView(cog=self, diff=diff),
+            ephemeral=True,
+        )
+
+    async def apply_roster_diff(self, diff: RosterDiff) -> None:
+        async with self.roster_lock:
+            self.db.check_diff(diff)
+            # Write the file first so a failed write leaves the live roster as it was.
+            await asyncio.to_thread(self.db.save, diff.records)
+            retired = self.db.apply_diff(diff)
+            await asyncio.to_thread(retired.release)
+        print(
+            f"[GAuth] Roster import: +{len(diff.added)} -{len(diff.removed)} ~{len(diff.changed)}"
+        )
+
 
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(VerificationCog(bot))
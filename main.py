@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import asyncio
 import os
+import sys
+from typing import Optional
 
 import discord
 from discord.errors import PrivilegedIntentsRequired
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from utils.command_sync import CommandSyncCache, sync_command_tree
+from utils.loop_watchdog import LoopWatchdog
+
 
 def _env_bool(name: str, default: bool = False) -> bool:
     raw = os.getenv(name)
@@ -17,6 +22,26 @@ def _env_bool(name: str, default: bool = False) -> bool:
     return raw in {"1", "true", "yes", "y", "on"}
 
 
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    return int(value)
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    return float(value)
+
+
 async def main() -> None:
     load_dotenv()
 
@@ -29,15 +54,45 @@ async def main() -> None:
 
     bot = commands.Bot(command_prefix="!", intents=intents)
 
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    sync_cache = CommandSyncCache(os.path.join(base_dir, ".command_sync.json"))
+    force_sync = "--force-sync" in sys.argv[1:] or _env_bool("FORCE_COMMAND_SYNC", default=False)
+    dev_guild_id = _env_int("DEV_GUILD_ID")
+    dev_guild = discord.Object(id=dev_guild_id) if dev_guild_id else None
+    tree_checked = False
+
     @bot.event
     async def on_ready() -> None:
+        # on_ready fires again after gateway reconnects; the tree cannot have
+        # changed in between, so only check it once per process.
+        nonlocal tree_checked
+        if tree_checked:
+            return
+        tree_checked = True
         try:
-            synced = await bot.tree.sync()
+            synced = await sync_command_tree(
+                bot.tree,
+                sync_cache,
+                application_id=bot.application_id,
+                guild=dev_guild,
+                force=force_sync,
+            )
+            if synced:
+                print(f"[GAuth] Commands synced ({'guild ' + str(dev_guild_id) if dev_guild else 'global'})")
             print(f"[GAuth] started successfully")
         except Exception as exc:
+            tree_checked = False
             print(f"[GAuth] Command sync failed: {exc}")
 
     await bot.load_extension("cogs.verification")
+    await bot.load_extension("cogs.diagnostics")
+
+    # Opt-in: report stalls of the event loop longer than LOOP_WATCHDOG_MS.
+    watchdog: Optional[LoopWatchdog] = None
+    watchdog_ms = _env_float("LOOP_WATCHDOG_MS")
+    if watchdog_ms is not None and watchdog_ms > 0:
+        watchdog = LoopWatchdog(threshold_ms=watchdog_ms, log_dir=os.path.join(base_dir, "logs"))
+        watchdog.start()
 
     try:
         await bot.start(token)
@@ -47,6 +102,9 @@ async def main() -> None:
     except Exception:
         await bot.close()
         raise
+    finally:
+        if watchdog is not None:
+            watchdog.stop()
 
 
 if __name__ == "__main__":
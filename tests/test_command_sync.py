@@ -0,0 +1,47 @@
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from utils.command_sync import command_tree_fingerprint
+
+
+def build_tree(*, with_limit: bool = False, permissions: Optional[discord.Permissions] = None) -> app_commands.CommandTree:
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+
+    @tree.command(name="ping", description="Check the bot is alive")
+    async def ping(interaction: discord.Interaction) -> None:
+        pass
+
+    if with_limit:
+
+        @tree.command(name="search", description="Find a member")
+        @app_commands.describe(query="Name to look up", limit="How many results")
+        async def search(interaction: discord.Interaction, query: str, limit: int = 25) -> None:
+            pass
+
+    else:
+
+        @tree.command(name="search", description="Find a member")
+        @app_commands.describe(query="Name to look up")
+        async def search(interaction: discord.Interaction, query: str) -> None:
+            pass
+
+    if permissions is not None:
+        search.default_permissions = permissions
+    return tree
+
+
+def test_fingerprint_is_stable_across_runs():
+    first = command_tree_fingerprint(build_tree())
+    assert command_tree_fingerprint(build_tree()) == first
+    assert command_tree_fingerprint(build_tree()) == first
+
+
+def test_fingerprint_changes_with_options_or_permissions():
+    base = command_tree_fingerprint(build_tree())
+    with_option = command_tree_fingerprint(build_tree(with_limit=True))
+    admin_only = command_tree_fingerprint(build_tree(permissions=discord.Permissions(manage_guild=True)))
+    roles_only = command_tree_fingerprint(build_tree(permissions=discord.Permissions(manage_roles=True)))
+
+    assert len({base, with_option, admin_only, roles_only}) == 4
@@ -0,0 +1,269 @@
+import random
+
+import pytest
+
+from utils.db_handler import DBHandler, MemberRecord, RosterError
+
+
+def osa_distance(a: str, b: str) -> int:
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def brute_force_suggest(records: list[MemberRecord], identifier: str) -> set[MemberRecord]:
+    identifier = identifier.strip().lower()
+    if "@" in identifier:
+        query, _, domain = identifier.partition("@")
+        distances = []
+        for record in records:
+            local, _, record_domain = record.email.partition("@")
+            distances.append(osa_distance(query, local) + (record_domain != domain))
+    else:
+        distances = [osa_distance(identifier, record.mssv.lower()) for record in records]
+    best = min(distances)
+    if best > 1:
+        return set()
+    return {record for record, distance in zip(records, distances) if distance == best}
+
+
+def typo(value: str, rng: random.Random, alphabet: str, *, single: bool = False) -> str:
+    i = rng.randrange(len(value))
+    kind = rng.choice(("swap", "substitute", "insert", "delete") + (() if single else ("double",)))
+    if kind == "swap" and i + 1 < len(value):
+        return value[:i] + value[i + 1] + value[i] + value[i + 2 :]
+    if kind == "substitute":
+        return value[:i] + rng.choice(alphabet) + value[i + 1 :]
+    if kind == "insert":
+        return value[:i] + rng.choice(alphabet) + value[i:]
+    if kind == "delete":
+        return value[:i] + value[i + 1 :]
+    return typo(typo(value, rng, alphabet, single=True), rng, alphabet, single=True)
+
+
+def write_csv(path, rows: list[tuple[str, str, str]]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for name, mssv, email in rows:
+            f.write(f'"{name}",{mssv},{email}\n')
+
+
+@pytest.fixture
+def roster(tmp_path):
+    rng = random.Random(31)
+    rows = []
+    for i in range(400):
+        mssv = f"205{rng.randrange(10**5):05d}"
+        local = "".join(rng.choice("abcdeghiklmnostuvy") for _ in range(rng.randint(4, 10)))
+        domain = rng.choice(("hcmus.edu.vn", "student.hcmus.edu.vn"))
+        rows.append((f"Sinh Viên {i}", mssv, f"{local}@{domain}"))
+    path = tmp_path / "Data.csv"
+    write_csv(path, rows)
+    db = DBHandler(str(path))
+    db.load()
+    return db, rng
+
+
+def test_suggest_matches_brute_force_for_mssv_typos(roster):
+    db, rng = roster
+    records = db.records()
+    for _ in range(300):
+        query = typo(rng.choice(records).mssv, rng, "0123456789")
+        if len(query) < 3:
+            continue
+        assert set(db.suggest(query, limit=len(records))) == brute_force_suggest(records, query), query
+
+
+def test_suggest_matches_brute_force_for_email_typos(roster):
+    db, rng = roster
+    records = db.records()
+    for _ in range(300):
+        local, _, domain = rng.choice(records).email.partition("@")
+        if rng.random() < 0.2:
+            domain = "gmail.com"
+        query = f"{typo(local, rng, 'abcdeghiklmnostuvy')}@{domain}"
+        assert set(db.suggest(query, limit=len(records))) == brute_force_suggest(records, query), query
+
+
+def test_suggest_finds_adjacent_swaps(tmp_path):
+    path = tmp_path / "Data.csv"
+    write_csv(path, [("A", "20520387", "a@x.vn"), ("B", "20527421", "b@x.vn"), ("C", "20520388", "c@x.vn")])
+    db = DBHandler(str(path))
+
+    assert [r.mssv for r in db.suggest("20523087")] == ["20520387"]
+    assert [r.mssv for r in db.suggest("20524721")] == ["20527421"]
+    # Only the best band: the exact record, not its one-edit neighbour.
+    assert [r.mssv for r in db.suggest("20520387")] == ["20520387"]
+    assert db.suggest("20599999") == []
+
+
+def test_suggest_after_import_matches_brute_force(roster, tmp_path):
+    db, rng = roster
+    records = db.records()
+    rows = [(r.full_name, r.mssv, r.email) for r in records[100:]]
+    rows += [(f"Mới {i}", f"206{i:05d}", f"moi{i}@hcmus.edu.vn") for i in range(50)]
+    rows[0] = (rows[0][0], rows[0][1], "doimail@hcmus.edu.vn")
+    upload = tmp_path / "upload.csv"
+    write_csv(upload, rows)
+
+    db.apply_diff(db.prepare_import(upload.read_bytes()))
+
+    records = db.records()
+    for _ in range(200):
+        query = typo(rng.choice(records).mssv, rng, "0123456789")
+        if len(query) < 3:
+            continue
+        assert set(db.suggest(query, limit=len(records))) == brute_force_suggest(records, query), query
+    assert db.suggest("doimail@hcmus.edu.vm")[0].email == "doimail@hcmus.edu.vn"
+
+
+def test_load_and_import_parse_rows_the_same_way(tmp_path):
+    data = '"Q",SV001,\n"Trần, Thị B",20520002,B@X.VN,K18\n\n'.encode()
+    path = tmp_path / "Data.csv"
+    path.write_bytes(data)
+    db = DBHandler(str(path))
+
+    assert db.records() == [
+        MemberRecord(full_name="Q", mssv="SV001", email=""),
+        MemberRecord(full_name="Trần, Thị B", mssv="20520002", email="b@x.vn", extra=("K18",)),
+    ]
+    assert db.prepare_import(data).empty
+
+
+def test_header_row_is_skipped_only_when_it_has_column_labels(tmp_path):
+    path = tmp_path / "Data.csv"
+    path.write_bytes("Họ và tên,MSSV,Email\nA,20520001,a@x.vn\n".encode("utf-8-sig"))
+    db = DBHandler(str(path))
+
+    assert [r.mssv for r in db.records()] == ["20520001"]
+
+
+def assert_same_roster(db: DBHandler, reloaded: DBHandler) -> None:
+    records = db.records()
+    assert records == reloaded.records()
+    for record in records:
+        for key in (record.mssv, record.email, record.email.upper()):
+            assert db.find_by_identifier(key) == reloaded.find_by_identifier(key), key
+    for record in records[:50]:
+        prefix = record.full_name.split()[-1]
+        assert db.search_by_name(prefix) == reloaded.search_by_name(prefix)
+        typo_mssv = record.mssv[1:] + "9"
+        assert db.suggest(typo_mssv, limit=100) == reloaded.suggest(typo_mssv, limit=100)
+
+
+def test_apply_diff_matches_reloading_the_saved_roster(tmp_path):
+    path = tmp_path / "Data.csv"
+    write_csv(
+        path,
+        [
+            ("Nguyễn Văn A", "1001", "a@x.vn"),
+            ("Trần Thị B", "1002", "shared@x.vn"),
+            ("Lê Văn C", "1003", "shared@x.vn"),
+            ("Phạm Thị D", "1004", "d@x.vn"),
+            ("Phạm Thị D (cũ)", "1004", "d.old@x.vn"),
+        ],
+    )
+    db = DBHandler(str(path))
+    db.load()
+
+    upload = "\n".join(
+        [
+            '"Nguyễn Văn A",1001,a.new@x.vn',
+            '"Lê Văn C",1003,shared@x.vn',
+            '"Phạm Thị D",1004,d@x.vn',
+            '"Võ Văn E",1005,shared@x.vn',
+        ]
+    ).encode()
+    diff = db.prepare_import(upload)
+    db.save(diff.records)
+    db.apply_diff(diff)
+
+    assert db.find_by_identifier("shared@x.vn").mssv == "1003"
+    assert db.find_by_identifier("a@x.vn") is None
+
+    reloaded = DBHandler(str(path))
+    reloaded.load()
+    assert_same_roster(db, reloaded)
+
+
+def test_apply_diff_matches_reload_on_a_random_roster(roster, tmp_path):
+    db, rng = roster
+    records = db.records()
+    rows = [(r.full_name, r.mssv, r.email) for r in records if rng.random() > 0.2]
+    rows = [(name, mssv, rng.choice(records).email if rng.random() < 0.1 else email) for name, mssv, email in rows]
+    rows += [(f"Mới {i}", f"206{i:05d}", rng.choice(records).email) for i in range(40)]
+    upload = tmp_path / "upload.csv"
+    write_csv(upload, rows)
+
+    diff = db.prepare_import(upload.read_bytes())
+    db.save(diff.records)
+    db.apply_diff(diff)
+    reloaded = DBHandler(db.csv_path)
+    reloaded.load()
+    assert_same_roster(db, reloaded)
+
+
+def test_save_keeps_extra_columns_and_row_order(tmp_path):
+    path = tmp_path / "Data.csv"
+    path.write_text("A,1001,a@x.vn,K18,0901\nB,1002,b@x.vn,K19,0902\nC,1003,c@x.vn\n", encoding="utf-8")
+    db = DBHandler(str(path))
+
+    upload = "A,1001,a@x.vn,K18,0901\nB,1002,b.new@x.vn,K19,0902\nD,1004,d@x.vn,K20\n".encode()
+    diff = db.prepare_import(upload)
+    db.save(diff.records)
+    db.apply_diff(diff)
+
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "A,1001,a@x.vn,K18,0901",
+        "B,1002,b.new@x.vn,K19,0902",
+        "D,1004,d@x.vn,K20",
+    ]
+    assert db.records() == diff.records
+
+
+def test_prepare_import_leaves_the_live_roster_untouched(tmp_path):
+    path = tmp_path / "Data.csv"
+    write_csv(path, [("A", "1001", "a@x.vn"), ("B", "1002", "b@x.vn")])
+    db = DBHandler(str(path))
+
+    diff = db.prepare_import('"B",1002,b@x.vn\n"C",1003,c@x.vn\n'.encode())
+    assert db.find_by_identifier("1001") is not None
+    assert db.find_by_identifier("1003") is None
+
+    db.apply_diff(diff).release()
+    assert db.find_by_identifier("1001") is None
+    assert db.find_by_identifier("c@x.vn").mssv == "1003"
+
+
+def test_apply_diff_requires_a_prepared_state(tmp_path):
+    path = tmp_path / "Data.csv"
+    write_csv(path, [("A", "1001", "a@x.vn")])
+    db = DBHandler(str(path))
+
+    diff = db.prepare_import('"B",1002,b@x.vn\n'.encode())
+    diff.state = None
+    with pytest.raises(RosterError):
+        db.apply_diff(diff)
+    assert db.find_by_identifier("1001") is not None
+
+
+def test_search_by_name_ignores_case_and_accents(tmp_path):
+    path = tmp_path / "Data.csv"
+    write_csv(
+        path,
+        [("Đặng Văn Ân", "1001", "a@x.vn"), ("Ðặng Văn Anh", "1002", "b@x.vn"), ("Nguyễn Văn An", "1003", "c@x.vn")],
+    )
+    db = DBHandler(str(path))
+
+    assert [r.mssv for r in db.search_by_name("dang van a")] == ["1001", "1002"]
+    assert sorted(r.mssv for r in db.search_by_name("VĂN AN")) == ["1001", "1002", "1003"]
+    assert [r.mssv for r in db.search_by_name("anh")] == ["1002"]
+    assert db.search_by_name("dang van b") == []
@@ -0,0 +1,33 @@
+import asyncio
+import json
+import time
+
+from utils.loop_watchdog import LoopWatchdog
+
+
+async def blocking_handler() -> None:
+    time.sleep(0.4)
+
+
+def test_blocking_sleep_records_one_incident_with_its_stack(tmp_path):
+    async def main() -> LoopWatchdog:
+        watchdog = LoopWatchdog(threshold_ms=100, log_dir=str(tmp_path))
+        watchdog.start()
+        try:
+            await asyncio.sleep(0.1)
+            await blocking_handler()
+            # Give the watchdog thread time to see the loop resume.
+            await asyncio.sleep(0.3)
+        finally:
+            watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(main())
+
+    assert len(watchdog.incidents) == 1
+    incident = watchdog.incidents[0]
+    assert 250 <= incident.duration_ms < 1000
+    assert "blocking_handler" in incident.stack
+    assert "time.sleep(0.4)" in incident.stack
+    lines = (tmp_path / "loop_blocking.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["stack"] for line in lines] == [incident.stack]
@@ -0,0 +1,13 @@
+from utils.name_utils import fold_name
+
+
+def test_fold_name_strips_vietnamese_diacritics():
+    assert fold_name("Đặng Văn Ân") == "dang van an"
+    assert fold_name("  NGUYỄN   thị\tHỒNG ") == "nguyen thi hong"
+    assert fold_name("Trương Ngọc Ánh") == "truong ngoc anh"
+
+
+def test_fold_name_maps_both_d_with_stroke_letters():
+    # U+0110/U+0111 is Vietnamese Đ/đ; U+00D0/U+00F0 (Ð/ð) is a common look-alike.
+    assert fold_name("Đðng Ðđ") == "ddng dd"
+    assert fold_name("") == ""
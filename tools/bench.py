@@ -0,0 +1,289 @@
+"""Micro-benchmarks for the utils hot paths.
+
+Covers roster load time and RSS, identifier lookups, typo suggestions and
+name search, OTP churn, log append, count and tail, and OTP message building.
+Results can be saved as a JSON baseline and later compared against it:
+
+    python -m tools.bench --save bench_baseline.json
+    python -m tools.bench --compare bench_baseline.json --threshold 15
+
+Compare mode exits non-zero when any benchmark is slower than its baseline by
+more than the threshold percentage, when load RSS grows by more than the
+(looser) RSS threshold, or when a baseline benchmark is missing from the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from tools.fixtures import write_roster
+from utils.db_handler import DBHandler
+from utils.mailer import build_otp_message
+from utils.otp_store import OTPStore
+from utils.verification_log import VerificationLog
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter so earlier benchmarks' heap does not skew the number.
+_LOAD_RSS_SCRIPT = """
+import gc, sys
+from tools.bench import _current_rss
+from utils.db_handler import DBHandler
+db = DBHandler(sys.argv[1])
+gc.collect()
+before = _current_rss()
+db.load()
+after = _current_rss()
+print(-1 if before is None or after is None else max(after - before, 0))
+"""
+
+
+def _current_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _load_rss(csv_path: str) -> Optional[int]:
+    """RSS growth in bytes of loading ``csv_path`` in a fresh interpreter."""
+    try:
+        output = subprocess.run(
+            [sys.executable, "-c", _LOAD_RSS_SCRIPT, csv_path],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        value = int(output.split()[-1])
+    except (OSError, subprocess.CalledProcessError, ValueError, IndexError):
+        return None
+    return value if value >= 0 else None
+
+
+def timeit(func: Callable[[], object], *, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Best per-call time in seconds over ``repeat`` runs of an auto-sized batch."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+class BenchRun:
+    def __init__(self, workdir: str) -> None:
+        self.workdir = workdir
+        self.results: dict[str, dict[str, object]] = {}
+
+    def record(self, name: str, value: float, unit: str) -> None:
+        self.results[name] = {"value": value, "unit": unit}
+        shown = f"{value * 1e6:.2f} us" if unit == "s" else f"{value / 1024 / 1024:.1f} MiB"
+        print(f"{name:<36} {shown}")
+
+    def bench_roster(self, size: int) -> None:
+        csv_path = os.path.join(self.workdir, f"roster_{size}.csv")
+        rows = write_roster(csv_path, size)
+
+        gc.collect()
+        db = DBHandler(csv_path)
+        started = time.perf_counter()
+        db.load()
+        self.record(f"db.load[{size}]", time.perf_counter() - started, "s")
+        rss = _load_rss(csv_path)
+        if rss is not None:
+            self.record(f"db.load_rss[{size}]", rss, "bytes")
+
+        mid_mssv = rows[size // 2][1]
+        last_email = rows[-1][2].upper()
+        self.record(f"db.lookup_mssv[{size}]", timeit(lambda: db.find_by_identifier(mid_mssv)), "s")
+        self.record(f"db.lookup_email[{size}]", timeit(lambda: db.find_by_identifier(last_email)), "s")
+        self.record(f"db.lookup_miss[{size}]", timeit(lambda: db.find_by_identifier("99999999")), "s")
+
+        # Swapping the leading digits gives a typo that is not in the roster.
+        typo_mssv = mid_mssv[1] + mid_mssv[0] + mid_mssv[2:]
+        self.record(f"db.suggest_mssv[{size}]", timeit(lambda: db.suggest(typo_mssv)), "s")
+        typo_email = "x" + rows[size // 3][2]
+        self.record(f"db.suggest_email[{size}]", timeit(lambda: db.suggest(typo_email)), "s")
+        self.record(f"db.search_name[{size}]", timeit(lambda: db.search_by_name("thu 12")), "s")
+
+    def bench_otp_store(self, users: int = 10_000) -> None:
+        store = OTPStore()
+
+        def churn() -> None:
+            for user_id in range(users):
+                store.set(user_id, code="123456", email="a@b.c", full_name="A", mssv="1", ttl_seconds=600)
+            for user_id in range(users):
+                store.get(user_id)
+            for user_id in range(users):
+                store.clear(user_id)
+
+        def expire() -> None:
+            for user_id in range(users):
+                store.set(user_id, code="123456", email="a@b.c", full_name="A", mssv="1", ttl_seconds=0)
+            for user_id in range(users):
+                store.get(user_id)
+
+        self.record(f"otp.set_get_clear[{users}]", timeit(churn, repeat=3), "s")
+        self.record(f"otp.set_expire[{users}]", timeit(expire, repeat=3), "s")
+
+    def bench_log(self, lines: int = 100_000) -> None:
+        log = VerificationLog(log_dir=os.path.join(self.workdir, f"logs_{lines}"))
+
+        def append() -> None:
+            log.log_success(
+                discord_id=1,
+                discord_username="bench",
+                full_name="Nguyễn Văn Thử",
+                mssv="20000000",
+                email="user@example.edu",
+            )
+
+        self.record("log.append_success", timeit(append), "s")
+
+        entry = json.dumps(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "discord_id": 1,
+                "discord_username": "bench",
+                "full_name": "Nguyễn Văn Thử",
+                "mssv": "20000000",
+                "email": "user@example.edu",
+                "reason": "bench",
+            },
+            ensure_ascii=False,
+        )
+        for path in (log.success_file, log.failed_file):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write((entry + "\n") * lines)
+
+        self.record(f"log.count_success[{lines}]", timeit(log.count_success, repeat=3), "s")
+        self.record(f"log.count_failed[{lines}]", timeit(log.count_failed, repeat=3), "s")
+        self.record(
+            f"log.tail_failed[{lines}]",
+            timeit(lambda: log.get_failed_entries(limit=10), repeat=3),
+            "s",
+        )
+
+    def bench_mailer(self) -> None:
+        def build() -> None:
+            build_otp_message(
+                smtp_user="gauth@example.edu",
+                from_name="USCC Auth",
+                to_email="user@example.edu",
+                otp_code="123456",
+                full_name="Nguyễn Văn Thử",
+            ).as_string()
+
+        self.record("mailer.build_message", timeit(build), "s")
+
+
+def compare(current: dict, baseline: dict, threshold: float, rss_threshold: float) -> tuple[list[str], list[str]]:
+    """Print a comparison table; returns ``(regressions, missing)`` benchmark names."""
+    regressions = []
+    print(f"\n{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<36} {'-':>12} {result['value']:>12.4g} {'new':>8}")
+            continue
+        change = (result["value"] - base["value"]) / base["value"] * 100
+        flag = ""
+        if change > (rss_threshold if result["unit"] == "bytes" else threshold):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {base['value']:>12.4g} {result['value']:>12.4g} {change:>+7.1f}%{flag}")
+
+    missing = [name for name in baseline if name not in current]
+    for name in missing:
+        print(f"{name:<36} {baseline[name]['value']:>12.4g} {'-':>12} {'missing':>8}")
+    return regressions, missing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GAuth utils micro-benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma separated roster sizes",
+    )
+    parser.add_argument("--log-lines", type=int, default=100_000)
+    parser.add_argument("--otp-users", type=int, default=10_000)
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Allowed slowdown in percent before compare mode fails",
+    )
+    parser.add_argument(
+        "--rss-threshold",
+        type=float,
+        default=25.0,
+        help="Allowed load RSS growth in percent before compare mode fails",
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    with tempfile.TemporaryDirectory(prefix="gauth-bench-") as workdir:
+        run = BenchRun(workdir)
+        for size in sizes:
+            run.bench_roster(size)
+        run.bench_otp_store(args.otp_users)
+        run.bench_log(args.log_lines)
+        run.bench_mailer()
+
+    if args.save:
+        payload = {
+            "meta": {
+                "created_at": datetime.now().isoformat(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+            },
+            "results": run.results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions, missing = compare(run.results, baseline, args.threshold, args.rss_threshold)
+        if missing:
+            print(f"\n{len(missing)} baseline benchmark(s) missing from this run")
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed beyond their threshold")
+        if missing or regressions:
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""Synthetic data shared by the load test and benchmarks."""
+
+from __future__ import annotations
+
+
+def write_roster(path: str, size: int) -> list[tuple[str, str, str]]:
+    rows = [
+        (f"Nguyễn Văn Thử {i}", f"{20000000 + i}", f"user{i}@example.edu")
+        for i in range(size)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        for name, mssv, mail in rows:
+            f.write(f'"{name}",{mssv},{mail}\n')
+    return rows
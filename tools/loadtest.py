@@ -0,0 +1,479 @@
+"""End-to-end load test for the verification flow.
+
+Drives ``VerificationView.start``, ``IdentifierModal.on_submit`` and
+``OTPModal.on_submit`` with fake Discord objects against a synthetic roster
+and an in-process SMTP sink that captures the OTP mails.
+
+    python -m tools.loadtest --roster-size 10000 --verifications 1000 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import email
+import json
+import math
+import os
+import re
+import smtplib
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+import cogs.verification
+from cogs.verification import AttemptTracker, OTPModal, VerificationView
+from tools.fixtures import write_roster
+from utils.db_handler import DBHandler
+from utils.mailer import build_otp_message, send_otp_email
+from utils.otp_store import OTPStore
+from utils.verification_log import VerificationLog
+
+OTP_RE = re.compile(r"\b(\d{6})\b")
+
+
+# SMTP sink
+
+
+class SMTPSink:
+    """Minimal SMTP server on its own thread and loop that records OTPs by recipient."""
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        self.host = host
+        self.port = 0
+        self.messages = 0
+        self.active_sessions = 0
+        self.max_sessions = 0
+        self._otps: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        ready = threading.Event()
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, 0, backlog=1024)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            loop.run_forever()
+            self._server.close()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def pop_otp(self, to_email: str) -> Optional[str]:
+        with self._lock:
+            return self._otps.pop(to_email, None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        with self._lock:
+            self.active_sessions += 1
+            self.max_sessions = max(self.max_sessions, self.active_sessions)
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        recipients: list[str] = []
+        try:
+            await reply("220 gauth-sink ESMTP")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").strip()
+                verb = line[:4].upper()
+                if verb == "EHLO":
+                    await reply("250-gauth-sink")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 gauth-sink")
+                elif verb == "MAIL":
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(line.split(":", 1)[1].strip().strip("<>").lower())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    body = await self._read_data(reader)
+                    self._capture(recipients, body)
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                elif verb in {"RSET", "NOOP"}:
+                    await reply("250 OK")
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            with self._lock:
+                self.active_sessions -= 1
+            writer.close()
+
+    @staticmethod
+    async def _read_data(reader: asyncio.StreamReader) -> bytes:
+        lines = []
+        while True:
+            raw = await reader.readline()
+            if not raw or raw in {b".\r\n", b".\n"}:
+                break
+            if raw.startswith(b".."):
+                raw = raw[1:]
+            lines.append(raw)
+        return b"".join(lines)
+
+    def _capture(self, recipients: list[str], body: bytes) -> None:
+        msg = email.message_from_bytes(body)
+        payload = msg.get_payload(decode=True) or b""
+        match = OTP_RE.search(payload.decode("utf-8", "replace"))
+        with self._lock:
+            self.messages += 1
+            if match:
+                for rcpt in recipients:
+                    self._otps[rcpt] = match.group(1)
+
+
+def send_plain_otp_email(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    smtp_user: str,
+    smtp_pass: str,
+    from_name: str,
+    to_email: str,
+    otp_code: str,
+    full_name: str,
+) -> None:
+    """Stand-in for ``send_otp_email`` that talks plain SMTP to the sink (no TLS, no AUTH)."""
+    msg = build_otp_message(
+        smtp_user=smtp_user,
+        from_name=from_name,
+        to_email=to_email,
+        otp_code=otp_code,
+        full_name=full_name,
+    )
+    with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
+        server.sendmail(smtp_user, [to_email], msg.as_string())
+
+
+# Fake Discord objects
+
+
+class FakeRole:
+    def __init__(self, role_id: int) -> None:
+        self.id = role_id
+
+
+class FakeUser:
+    def __init__(self, user_id: int) -> None:
+        self.id = user_id
+        self.name = f"loadtest_{user_id}"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeMember(FakeUser):
+    def __init__(self, user_id: int, latency: float) -> None:
+        super().__init__(user_id)
+        self.roles: list[FakeRole] = []
+        self.nick: Optional[str] = None
+        self._latency = latency
+
+    async def add_roles(self, *roles: FakeRole, reason: Optional[str] = None) -> None:
+        await asyncio.sleep(self._latency)
+        self.roles.extend(roles)
+
+    async def edit(self, *, nick: Optional[str] = None, reason: Optional[str] = None) -> None:
+        await asyncio.sleep(self._latency)
+        self.nick = nick
+
+
+class FakeGuild:
+    def __init__(self, role: FakeRole, latency: float) -> None:
+        self.role = role
+        self.members: dict[int, FakeMember] = {}
+        self._latency = latency
+
+    def add_member(self, user_id: int) -> FakeMember:
+        member = FakeMember(user_id, self._latency)
+        self.members[user_id] = member
+        return member
+
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return self.members.get(user_id)
+
+    async def fetch_member(self, user_id: int) -> FakeMember:
+        await asyncio.sleep(self._latency)
+        return self.members[user_id]
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return self.role if role_id == self.role.id else None
+
+
+class FakeResponse:
+    def __init__(self, latency: float) -> None:
+        self.modal: Any = None
+        self.messages: list[str] = []
+        self._latency = latency
+
+    async def defer(self, **kwargs: Any) -> None:
+        await asyncio.sleep(self._latency)
+
+    async def send_message(self, content: str, **kwargs: Any) -> None:
+        await asyncio.sleep(self._latency)
+        self.messages.append(content)
+
+    async def send_modal(self, modal: Any) -> None:
+        await asyncio.sleep(self._latency)
+        self.modal = modal
+
+
+class FakeFollowup:
+    def __init__(self, latency: float) -> None:
+        self.content: Optional[str] = None
+        self.view: Any = None
+        self._latency = latency
+
+    async def send(self, content: str, *, view: Any = None, **kwargs: Any) -> None:
+        await asyncio.sleep(self._latency)
+        self.content = content
+        self.view = view
+
+
+class FakeInteraction:
+    def __init__(self, member: FakeMember, guild: FakeGuild, latency: float) -> None:
+        self.user = member
+        self.guild = guild
+        self.client = None
+        self.response = FakeResponse(latency)
+        self.followup = FakeFollowup(latency)
+
+
+def _fill(text_input: Any, value: str) -> None:
+    # Same path discord.py uses when a modal submission arrives.
+    text_input._refresh_state(None, {"value": value})
+
+
+# Harness
+
+
+@dataclass
+class LoadTestResult:
+    roster_size: int
+    verifications: int
+    concurrency: int
+    succeeded: int
+    failed: int
+    roster_load_s: float
+    wall_s: float
+    throughput_per_min: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    smtp_messages: int
+    smtp_max_concurrency: int
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    failure_reasons: dict[str, int] = field(default_factory=dict)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+async def _lag_monitor(samples: list[float], stop: asyncio.Event, interval: float = 0.02) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(time.perf_counter() - started - interval, 0.0))
+
+
+async def run_load_test(
+    *,
+    roster_size: int,
+    verifications: int,
+    concurrency: int,
+    discord_latency_ms: float = 0.0,
+    workdir: Optional[str] = None,
+) -> LoadTestResult:
+    # The sink keys captured OTPs by recipient, so two verifications in
+    # flight for the same row would take each other's code.
+    if verifications > roster_size:
+        raise ValueError("verifications must not exceed roster_size; each one needs its own roster row")
+    workdir = workdir or tempfile.mkdtemp(prefix="gauth-loadtest-")
+    csv_path = os.path.join(workdir, "Data.csv")
+    rows = write_roster(csv_path, roster_size)
+    latency = discord_latency_ms / 1000.0
+
+    sink = SMTPSink()
+    latencies: list[float] = []
+    failures: list[str] = []
+    lag_samples: list[float] = []
+    stop = asyncio.Event()
+    monitor: Optional[asyncio.Task] = None
+    started = time.perf_counter()
+    try:
+        sink.start()
+        # The sink speaks plain SMTP; the production mailer always uses TLS and AUTH.
+        cogs.verification.send_otp_email = send_plain_otp_email
+
+        db = DBHandler(csv_path)
+        started = time.perf_counter()
+        db.load()
+        roster_load_s = time.perf_counter() - started
+
+        role = FakeRole(1)
+        guild = FakeGuild(role, latency)
+        otp_store = OTPStore()
+        verification_log = VerificationLog(log_dir=os.path.join(workdir, "logs"))
+        attempt_tracker = AttemptTracker()
+        max_attempts = 5
+        view = VerificationView(
+            db=db,
+            otp_store=otp_store,
+            verification_log=verification_log,
+            attempt_tracker=attempt_tracker,
+            verified_role_id=role.id,
+            smtp_host=sink.host,
+            smtp_port=sink.port,
+            smtp_user="gauth@loadtest.local",
+            smtp_pass="",
+            smtp_from_name="GAuth Load Test",
+            otp_ttl_seconds=600,
+            max_attempts=max_attempts,
+        )
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def verify_one(index: int) -> None:
+            _, mssv, mail = rows[index]
+            member = guild.add_member(10**17 + index)
+            async with semaphore:
+                t0 = time.perf_counter()
+
+                interaction = FakeInteraction(member, guild, latency)
+                await view.start.callback(interaction)
+                identifier_modal = interaction.response.modal
+                if identifier_modal is None:
+                    failures.append("start: no modal")
+                    return
+                _fill(identifier_modal.identifier, mssv)
+
+                interaction = FakeInteraction(member, guild, latency)
+                await identifier_modal.on_submit(interaction)
+                if interaction.followup.view is None:
+                    failures.append(f"identifier: {interaction.followup.content}")
+                    return
+                code = sink.pop_otp(mail)
+                if code is None:
+                    failures.append("smtp: no OTP captured")
+                    return
+
+                otp_modal = OTPModal(
+                    otp_store=otp_store,
+                    verification_log=verification_log,
+                    attempt_tracker=attempt_tracker,
+                    verified_role_id=role.id,
+                    max_attempts=max_attempts,
+                )
+                _fill(otp_modal.otp, code)
+                interaction = FakeInteraction(member, guild, latency)
+                await otp_modal.on_submit(interaction)
+                if role not in member.roles:
+                    failures.append(f"otp: {interaction.followup.content}")
+                    return
+
+                latencies.append(time.perf_counter() - t0)
+
+        monitor = asyncio.create_task(_lag_monitor(lag_samples, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(verify_one(i) for i in range(verifications)))
+    finally:
+        wall_s = time.perf_counter() - started
+        stop.set()
+        if monitor is not None:
+            await monitor
+        sink.stop()
+        cogs.verification.send_otp_email = send_otp_email
+
+    return LoadTestResult(
+        roster_size=roster_size,
+        verifications=verifications,
+        concurrency=concurrency,
+        succeeded=len(latencies),
+        failed=len(failures),
+        roster_load_s=round(roster_load_s, 3),
+        wall_s=round(wall_s, 3),
+        throughput_per_min=round(len(latencies) / wall_s * 60, 1) if wall_s else 0.0,
+        latency_p50_ms=round(percentile(latencies, 50) * 1000, 1),
+        latency_p95_ms=round(percentile(latencies, 95) * 1000, 1),
+        latency_p99_ms=round(percentile(latencies, 99) * 1000, 1),
+        smtp_messages=sink.messages,
+        smtp_max_concurrency=sink.max_sessions,
+        loop_lag_p50_ms=round(percentile(lag_samples, 50) * 1000, 1),
+        loop_lag_p99_ms=round(percentile(lag_samples, 99) * 1000, 1),
+        loop_lag_max_ms=round(max(lag_samples, default=0.0) * 1000, 1),
+        failure_reasons=dict(Counter(failures).most_common()),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GAuth verification load test")
+    parser.add_argument("--roster-size", type=int, default=10000)
+    parser.add_argument("--verifications", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--discord-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated round trip for each fake Discord API call",
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the result to this file")
+    args = parser.parse_args()
+    if args.verifications > args.roster_size:
+        parser.error("--verifications must not exceed --roster-size (each verification uses its own row)")
+
+    result = asyncio.run(
+        run_load_test(
+            roster_size=args.roster_size,
+            verifications=args.verifications,
+            concurrency=args.concurrency,
+            discord_latency_ms=args.discord_latency_ms,
+        )
+    )
+
+    for key, value in asdict(result).items():
+        print(f"{key:>22}: {value}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(result), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+import discord
+from discord import app_commands
+
+
+def _command_payload(command: Any, tree: app_commands.CommandTree) -> dict:
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py < 2.4 serialises commands without the tree.
+        return command.to_dict()
+
+
+def command_tree_fingerprint(
+    tree: app_commands.CommandTree,
+    *,
+    guild: Optional[discord.abc.Snowflake] = None,
+) -> str:
+    """Stable hash of what ``tree.sync(guild=guild)`` would upload."""
+    payloads = [_command_payload(command, tree) for command in tree.get_commands(guild=guild)]
+    payloads.sort(key=lambda p: (p.get("type", 1), p.get("name", "")))
+    blob = json.dumps(payloads, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CommandSyncCache:
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def _read(self) -> dict[str, str]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, scope: str) -> Optional[str]:
+        return self._read().get(scope)
+
+    def set(self, scope: str, fingerprint: str) -> None:
+        data = self._read()
+        data[scope] = fingerprint
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        tmp_path.replace(self.path)
+
+
+async def sync_command_tree(
+    tree: app_commands.CommandTree,
+    cache: CommandSyncCache,
+    *,
+    application_id: Optional[int],
+    guild: Optional[discord.abc.Snowflake] = None,
+    force: bool = False,
+) -> bool:
+    """Sync the tree only when its fingerprint changed since the last sync.
+
+    With ``guild`` set, global commands are copied to that guild and only the
+    guild scope is synced, which Discord applies instantly (useful in
+    development). Returns whether a sync was performed.
+    """
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+
+    scope = f"{application_id}:{'global' if guild is None else f'guild:{guild.id}'}"
+    fingerprint = command_tree_fingerprint(tree, guild=guild)
+    if not force and cache.get(scope) == fingerprint:
+        return False
+
+    await tree.sync(guild=guild)
+    cache.set(scope, fingerprint)
+    return True
@@ -1,83 +1,600 @@
 from __future__ import annotations
 
+import bisect
+import csv
+import io
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, NamedTuple, Optional
 
-import pandas as pd
+import numpy as np
 
+from utils.name_utils import fold_name
 
-@dataclass(frozen=True)
-class MemberRecord:
+# Polynomial hash base for the typo index (arithmetic wraps modulo 2**64).
+_HASH_BASE = 1_000_003
+# Low bits of a name index entry hold the word offset, the rest the record id.
+_NAME_OFFSET_BITS = 16
+# Above this share of new entries, re-sorting beats inserting one by one.
+_NAME_RESORT_RATIO = 0.1
+# Folded MSSV/email column labels that mark a header row in an export.
+_HEADER_LABELS = {"mssv", "ma sv", "ma so sinh vien", "student id", "id", "email", "e-mail", "mail"}
+
+
+class RosterError(RuntimeError):
+    pass
+
+
+class MemberRecord(NamedTuple):
     full_name: str
     mssv: str
     email: str
+    # Columns after the email (cohort, phone, ...), written back unchanged.
+    extra: tuple[str, ...] = ()
+
+
+@dataclass
+class RosterDiff:
+    version: int
+    added: list[MemberRecord] = field(default_factory=list)
+    removed: list[tuple[int, MemberRecord]] = field(default_factory=list)
+    changed: list[tuple[int, MemberRecord, MemberRecord]] = field(default_factory=list)
+    unchanged: int = 0
+    # Full roster after the diff, in file order, for writing before applying.
+    records: list[MemberRecord] = field(default_factory=list, repr=False)
+    # Lookup state after the diff, built off the event loop.
+    state: Optional[_RosterState] = field(default=None, repr=False)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def _variant_hashes(keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """32-bit hashes of each key and of its distinct one-character deletions.
+
+    Returns ``(hashes, owners)`` where ``owners`` holds the position in
+    ``keys`` each hash came from. Keys are hashed in bulk per length.
+    """
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    codes = np.frombuffer("".join(keys).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    starts = np.cumsum(lengths) - lengths
+    hashes: list[np.ndarray] = []
+    owners: list[np.ndarray] = []
+    for length in np.unique(lengths).tolist():
+        if length == 0:
+            continue
+        rows = np.flatnonzero(lengths == length)
+        chars = codes[starts[rows, None] + np.arange(length)]
+        # prefix[:, i] hashes key[:i], suffix[:, i] hashes key[i:].
+        prefix = np.zeros((len(rows), length + 1), dtype=np.uint64)
+        suffix = np.zeros((len(rows), length + 1), dtype=np.uint64)
+        powers = np.array([pow(_HASH_BASE, i, 2**64) for i in range(length + 1)], dtype=np.uint64)
+        for i in range(length):
+            prefix[:, i + 1] = prefix[:, i] * np.uint64(_HASH_BASE) + chars[:, i]
+        for i in range(length - 1, -1, -1):
+            suffix[:, i] = chars[:, i] * powers[length - 1 - i] + suffix[:, i + 1]
+
+        hashes.append(prefix[:, length])
+        owners.append(rows)
+        for i in range(length):
+            deleted = prefix[:, i] * powers[length - 1 - i] + suffix[:, i + 1]
+            # Deleting either of two equal neighbours gives the same string.
+            keep = slice(None) if i == 0 else chars[:, i] != chars[:, i - 1]
+            hashes.append(deleted[keep])
+            owners.append(rows[keep])
+    if not hashes:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
+    # Fibonacci hashing folds all 64 bits into the top 32; collisions only
+    # cost an extra distance check.
+    mixed = np.concatenate(hashes) * np.uint64(0x9E3779B97F4A7C15)
+    return (mixed >> np.uint64(32)).astype(np.uint32), np.concatenate(owners)
+
+
+class _DeletionIndex:
+    """Symmetric deletion index over MSSVs or email local parts.
+
+    Every key is stored with all its one-character deletions as sorted hashes.
+    Two strings within one edit (insert, delete, substitute or swap adjacent
+    characters) always share such a variant, so looking up the variants of a
+    query finds every record within one edit; hash collisions only add
+    candidates that the edit distance check then rejects.
+    """
+
+    __slots__ = ("hashes", "rids")
+
+    def __init__(self, hashes: np.ndarray, rids: np.ndarray) -> None:
+        self.hashes = hashes
+        self.rids = rids
+
+    @classmethod
+    def build(cls, entries: Iterable[tuple[int, str]]) -> _DeletionIndex:
+        entries = [(rid, key) for rid, key in entries if key]
+        hashes, owners = _variant_hashes([key for _, key in entries])
+        rids = np.fromiter((rid for rid, _ in entries), dtype=np.int32, count=len(entries))[owners]
+        order = np.argsort(hashes, kind="stable")
+        return cls(hashes[order], rids[order])
+
+    def merged(self, added: Iterable[tuple[int, str]], removed: Iterable[int]) -> _DeletionIndex:
+        new = _DeletionIndex.build(added)
+        keep = ~np.isin(self.rids, np.fromiter(removed, dtype=np.int32))
+        hashes = np.concatenate((self.hashes[keep], new.hashes))
+        rids = np.concatenate((self.rids[keep], new.rids))
+        order = np.argsort(hashes, kind="stable")
+        return _DeletionIndex(hashes[order], rids[order])
+
+    def candidates(self, key: str) -> list[int]:
+        hashes = np.unique(_variant_hashes([key])[0])
+        lo = np.searchsorted(self.hashes, hashes, side="left")
+        hi = np.searchsorted(self.hashes, hashes, side="right")
+        found = [self.rids[a:b] for a, b in zip(lo.tolist(), hi.tolist()) if a < b]
+        if not found:
+            return []
+        return np.unique(np.concatenate(found)).tolist()
+
+
+_EMPTY_INDEX = _DeletionIndex(np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int32))
+
+
+class _KeyIndex:
+    """Exact MSSV or email lookup; the earliest record wins on duplicates.
+
+    Later holders of a key are remembered, so removing the winner hands the
+    key to the next one instead of dropping it.
+    """
+
+    __slots__ = ("_first", "_rest")
+
+    def __init__(self) -> None:
+        self._first: dict[str, int] = {}
+        self._rest: dict[str, list[int]] = {}
+
+    def get(self, key: str) -> Optional[int]:
+        return self._first.get(key)
+
+    def copy(self) -> _KeyIndex:
+        index = _KeyIndex()
+        index._first = dict(self._first)
+        index._rest = {key: list(rids) for key, rids in self._rest.items()}
+        return index
+
+    def add(self, key: str, rid: int) -> None:
+        if not key:
+            return
+        held = self._first.setdefault(key, rid)
+        if held == rid:
+            return
+        if rid < held:
+            self._first[key], rid = rid, held
+        bisect.insort(self._rest.setdefault(key, []), rid)
+
+    def remove(self, key: str, rid: int) -> None:
+        rest = self._rest.get(key)
+        if self._first.get(key) == rid:
+            if rest:
+                self._first[key] = rest.pop(0)
+            else:
+                del self._first[key]
+        elif rest and rid in rest:
+            rest.remove(rid)
+        if rest is not None and not rest:
+            del self._rest[key]
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance capped at 2: 0, 1 or "more than one"."""
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return 2
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return 1 if a[i:] == b[i + 1 :] else 2
+    if a[i + 1 :] == b[i + 1 :]:
+        return 1
+    swapped = i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i]
+    return 1 if swapped and a[i + 2 :] == b[i + 2 :] else 2
+
+
+def _name_entries(rid: int, folded: str) -> list[int]:
+    """Index entries for each word start of a folded name, so "an" finds "nguyen van an"."""
+    entries = [rid << _NAME_OFFSET_BITS]
+    offset = folded.find(" ")
+    while 0 <= offset < (1 << _NAME_OFFSET_BITS) - 1:
+        entries.append(rid << _NAME_OFFSET_BITS | offset + 1)
+        offset = folded.find(" ", offset + 1)
+    return entries
+
+
+class _NameIndex:
+    """Prefix search over accent-folded names.
+
+    Keeps one folded name per record and an int64 array of entries packing
+    (record id, word offset), sorted by the name suffix each entry points
+    at, with the entry itself breaking ties. Suffixes are sliced on demand
+    while bisecting instead of being stored.
+    """
+
+    __slots__ = ("folded", "entries")
+
+    def __init__(self, folded: dict[int, str], entries: np.ndarray) -> None:
+        self.folded = folded
+        self.entries = entries
+
+    def _key(self, entry: int) -> str:
+        return self.folded[entry >> _NAME_OFFSET_BITS][entry & (1 << _NAME_OFFSET_BITS) - 1 :]
+
+    def _sorted(self) -> np.ndarray:
+        entries = [entry for rid, name in self.folded.items() for entry in _name_entries(rid, name)]
+        entries.sort()
+        entries.sort(key=self._key)
+        return np.array(entries, dtype=np.int64)
+
+    def _bisect(self, key: str, entry: int = -1) -> int:
+        """Position of ``(key, entry)`` among the sorted entries."""
+        entries = self.entries
+        lo, hi = 0, len(entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = int(entries[mid])
+            if (self._key(other), other) < (key, entry):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @classmethod
+    def build(cls, records: Iterable[tuple[int, MemberRecord]]) -> _NameIndex:
+        index = cls({rid: fold_name(record.full_name) for rid, record in records}, np.empty(0, dtype=np.int64))
+        index.entries = index._sorted()
+        return index
+
+    def merged(self, added: Iterable[tuple[int, MemberRecord]], removed: set[int]) -> _NameIndex:
+        folded = dict(self.folded)
+        for rid in removed:
+            folded.pop(rid, None)
+        new_names = {rid: fold_name(record.full_name) for rid, record in added}
+        folded.update(new_names)
+        gone = np.fromiter(removed, dtype=np.int64, count=len(removed))
+        index = _NameIndex(folded, self.entries[~np.isin(self.entries >> _NAME_OFFSET_BITS, gone)])
+
+        new = [entry for rid, name in new_names.items() for entry in _name_entries(rid, name)]
+        if len(new) > len(index.entries) * _NAME_RESORT_RATIO:
+            index.entries = index._sorted()
+            return index
+        new.sort(key=lambda entry: (index._key(entry), entry))
+        positions = [index._bisect(index._key(entry), entry) for entry in new]
+        index.entries = np.insert(index.entries, positions, np.array(new, dtype=np.int64))
+        return index
+
+    def search(self, prefix: str) -> Iterator[int]:
+        """Record ids whose name has a word sequence starting with ``prefix``, in index order."""
+        entries = self.entries
+        for i in range(self._bisect(prefix), len(entries)):
+            entry = int(entries[i])
+            if not self._key(entry).startswith(prefix):
+                return
+            yield entry >> _NAME_OFFSET_BITS
+
+
+_EMPTY_NAME_INDEX = _NameIndex({}, np.empty(0, dtype=np.int64))
+
+
+def _typo_keys(records: Iterable[tuple[int, MemberRecord]]) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    """(rid, MSSV) and (rid, email local part) pairs for the typo indexes."""
+    mssvs: list[tuple[int, str]] = []
+    locals_: list[tuple[int, str]] = []
+    for rid, record in records:
+        mssvs.append((rid, record.mssv.lower()))
+        # The domain is shared by nearly everyone; index the local part.
+        locals_.append((rid, record.email.partition("@")[0]))
+    return mssvs, locals_
+
+
+def _merge_typo_indexes(
+    indexes: tuple[_DeletionIndex, _DeletionIndex],
+    added: Iterable[tuple[int, MemberRecord]],
+    removed: set[int],
+) -> tuple[_DeletionIndex, _DeletionIndex]:
+    mssvs, locals_ = _typo_keys(added)
+    return indexes[0].merged(mssvs, removed), indexes[1].merged(locals_, removed)
+
+
+@dataclass
+class _RosterState:
+    """Everything lookups read. Never mutated once live; imports build a new one."""
+
+    records: dict[int, MemberRecord] = field(default_factory=dict)
+    by_mssv: _KeyIndex = field(default_factory=_KeyIndex)
+    by_email: _KeyIndex = field(default_factory=_KeyIndex)
+    name_index: _NameIndex = _EMPTY_NAME_INDEX
+    mssv_index: _DeletionIndex = _EMPTY_INDEX
+    email_index: _DeletionIndex = _EMPTY_INDEX
+    next_id: int = 0
+
+    @classmethod
+    def build(cls, records: Iterable[MemberRecord]) -> _RosterState:
+        state = cls()
+        for record in records:
+            state.add(record)
+        state.name_index = _NameIndex.build(state.records.items())
+        mssvs, locals_ = _typo_keys(state.records.items())
+        state.mssv_index = _DeletionIndex.build(mssvs)
+        state.email_index = _DeletionIndex.build(locals_)
+        return state
+
+    def add(self, record: MemberRecord) -> int:
+        rid = self.next_id
+        self.next_id += 1
+        self.records[rid] = record
+        # First row wins on duplicates, like the original scan did.
+        self.by_mssv.add(record.mssv, rid)
+        self.by_email.add(record.email, rid)
+        return rid
+
+    def remove(self, rid: int) -> None:
+        record = self.records.pop(rid)
+        self.by_mssv.remove(record.mssv, rid)
+        self.by_email.remove(record.email, rid)
+
+    def replace(self, rid: int, record: MemberRecord) -> None:
+        # Keeps the id, so the record keeps its place in the file.
+        old = self.records[rid]
+        self.by_mssv.remove(old.mssv, rid)
+        self.by_email.remove(old.email, rid)
+        self.records[rid] = record
+        self.by_mssv.add(record.mssv, rid)
+        self.by_email.add(record.email, rid)
+
+    def updated(self, diff: RosterDiff) -> _RosterState:
+        """A copy of this state with ``diff`` applied; ``self`` is left as is."""
+        state = _RosterState(
+            records=dict(self.records),
+            by_mssv=self.by_mssv.copy(),
+            by_email=self.by_email.copy(),
+            next_id=self.next_id,
+        )
+        for rid, _ in diff.removed:
+            state.remove(rid)
+        for rid, _, new in diff.changed:
+            state.replace(rid, new)
+        added = [(rid, new) for rid, _, new in diff.changed]
+        added += [(state.add(record), record) for record in diff.added]
+
+        removed = {rid for rid, _ in diff.removed} | {rid for rid, _, _ in diff.changed}
+        state.name_index = self.name_index.merged(added, removed)
+        state.mssv_index, state.email_index = _merge_typo_indexes(
+            (self.mssv_index, self.email_index), added, removed
+        )
+        return state
+
+    def release(self) -> None:
+        """Drop the containers of a retired state; slow for big rosters, so call it off the loop."""
+        self.records = {}
+        self.by_mssv = self.by_email = _KeyIndex()
+        self.name_index = _EMPTY_NAME_INDEX
+        self.mssv_index = self.email_index = _EMPTY_INDEX
+
+
+def _roster_key(record: MemberRecord) -> str:
+    return record.mssv or record.email
+
+
+def _is_header(row: list[str]) -> bool:
+    return any(fold_name(cell) in _HEADER_LABELS for cell in row[1:3])
+
+
+def parse_roster_csv(data: bytes) -> list[MemberRecord]:
+    """Parse roster CSV (name, MSSV, email), from Data.csv or an upload.
+
+    Data.csv has no header; a first row is only skipped when its MSSV or
+    email column holds a column label such as "MSSV" or "Email".
+    """
+    records: list[MemberRecord] = []
+    stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.reader(stream):
+            if not any(cell.strip() for cell in row):
+                continue
+            if not records and _is_header(row):
+                continue
+            full_name, mssv, email = (row + ["", "", ""])[:3]
+            # Positional: keyword construction costs a lot at a million rows.
+            records.append(MemberRecord(full_name.strip(), mssv.strip(), email.strip().lower(), tuple(row[3:])))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise RosterError(f"Invalid roster CSV: {exc}")
+    return records
+
+
+def diff_roster(
+    current: list[tuple[int, MemberRecord]],
+    incoming: list[MemberRecord],
+    *,
+    version: int,
+) -> RosterDiff:
+    """Compare a roster snapshot with an incoming roster, keyed by MSSV (or email)."""
+    diff = RosterDiff(version=version)
+
+    new_by_key: dict[str, MemberRecord] = {}
+    for record in incoming:
+        key = _roster_key(record)
+        if key:
+            new_by_key.setdefault(key, record)
+
+    seen: set[str] = set()
+    for rid, record in current:
+        key = _roster_key(record)
+        new_record = new_by_key.get(key)
+        if new_record is None or key in seen:
+            # Gone from the upload, or a duplicate the upload collapses.
+            diff.removed.append((rid, record))
+            continue
+        seen.add(key)
+        if new_record == record:
+            diff.unchanged += 1
+        else:
+            diff.changed.append((rid, record, new_record))
+
+    diff.added = [record for key, record in new_by_key.items() if key not in seen]
+    return diff
 
 
 class DBHandler:
     def __init__(self, csv_path: str) -> None:
         self.csv_path = csv_path
-        self._df: Optional[pd.DataFrame] = None
+        self._loaded = False
+        self._state = _RosterState()
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._ensure_loaded().records)
 
     def load(self) -> None:
         if not os.path.exists(self.csv_path):
             raise FileNotFoundError(f"CSV not found: {self.csv_path}")
 
-        # Data has no header; some fields may be quoted and contain commas.
-        df = pd.read_csv(
-            self.csv_path,
-            header=None,
-            dtype=str,
-            keep_default_na=False,
-            encoding="utf-8",
-        )
+        with open(self.csv_path, "rb") as f:
+            records = parse_roster_csv(f.read())
 
-        # Ensure at least 3 columns exist (we need 0,1,2)
-        needed_cols = 3
-        if df.shape[1] < needed_cols:
-            for col in range(df.shape[1], needed_cols):
-                df[col] = ""
+        self._state = _RosterState.build(records)
+        self._version += 1
+        self._loaded = True
 
-        # Normalize
-        df[0] = df[0].astype(str).str.strip()
-        df[1] = df[1].astype(str).str.strip()
-        df[2] = df[2].astype(str).str.strip().str.lower()
+    def _ensure_loaded(self) -> _RosterState:
+        if not self._loaded:
+            self.load()
+        return self._state
 
-        self._df = df
+    def prepare_import(self, data: bytes) -> RosterDiff:
+        """Parse an uploaded roster and diff it against the live one.
 
-    def _ensure_loaded(self) -> pd.DataFrame:
-        if self._df is None:
-            self.load()
-        assert self._df is not None
-        return self._df
+        Meant for a worker thread: it only reads the live state and builds
+        the post-import state, so ``apply_diff`` is a swap on the loop.
+        Imports must be serialized by the caller.
+        """
+        incoming = parse_roster_csv(data)
+        state = self._ensure_loaded()
+
+        current = list(state.records.items())
+        diff = diff_roster(current, incoming, version=self._version)
+        replaced = {rid: new for rid, _, new in diff.changed}
+        dropped = {rid for rid, _ in diff.removed}
+        diff.records = [replaced.get(rid, record) for rid, record in current if rid not in dropped]
+        diff.records += diff.added
+        diff.state = state.updated(diff)
+        return diff
+
+    def check_diff(self, diff: RosterDiff) -> None:
+        """Raise ``RosterError`` if the roster changed since ``diff`` was prepared."""
+        self._ensure_loaded()
+        if diff.version != self._version:
+            raise RosterError("Roster changed since this import was prepared. Upload it again.")
+
+    def apply_diff(self, diff: RosterDiff) -> _RosterState:
+        """Swap in the state ``prepare_import`` built for ``diff``.
+
+        Returns the retired state; call its ``release`` from a worker thread.
+        """
+        self.check_diff(diff)
+        if diff.state is None:
+            # Rebuilding here would copy and re-sort every index on the event loop.
+            raise RosterError("Import was not prepared. Upload it again.")
+        retired = self._state
+        self._state = diff.state
+        self._version += 1
+        return retired
+
+    def records(self) -> list[MemberRecord]:
+        return list(self._ensure_loaded().records.values())
+
+    def save(self, records: Iterable[MemberRecord]) -> None:
+        """Atomically rewrite the roster CSV. Safe to call from a worker thread.
+
+        On error the old file is left in place and the error is raised.
+        """
+        tmp_path = f"{self.csv_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                for record in records:
+                    writer.writerow([record.full_name, record.mssv, record.email, *record.extra])
+            os.replace(tmp_path, self.csv_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def find_by_identifier(self, identifier: str) -> Optional[MemberRecord]:
         identifier = (identifier or "").strip()
         if not identifier:
             return None
 
-        df = self._ensure_loaded()
-
-        identifier_lower = identifier.lower()
+        state = self._ensure_loaded()
 
         # MSSV match (exact)
-        mssv_match = df[df[1] == identifier]
-        if not mssv_match.empty:
-            row = mssv_match.iloc[0]
-            return MemberRecord(
-                full_name=str(row[0]).strip(),
-                mssv=str(row[1]).strip(),
-                email=str(row[2]).strip().lower(),
-            )
+        rid = state.by_mssv.get(identifier)
+        if rid is not None:
+            return state.records[rid]
 
         # Email match (case-insensitive exact)
-        email_match = df[df[2] == identifier_lower]
-        if not email_match.empty:
-            row = email_match.iloc[0]
-            return MemberRecord(
-                full_name=str(row[0]).strip(),
-                mssv=str(row[1]).strip(),
-                email=str(row[2]).strip().lower(),
-            )
+        rid = state.by_email.get(identifier.lower())
+        if rid is not None:
+            return state.records[rid]
 
         return None
+
+    def suggest(self, identifier: str, *, limit: int = 3) -> list[MemberRecord]:
+        """Likely intended records for a mistyped MSSV or email.
+
+        Returns the records closest to ``identifier`` within one edit; only
+        the best distance band is kept. For emails the distance is that of
+        the local part, plus one if the domain differs.
+        """
+        identifier = (identifier or "").strip().lower()
+        if len(identifier) < 3:
+            return []
+
+        state = self._ensure_loaded()
+        records = state.records
+        is_email = "@" in identifier
+        if is_email:
+            query, _, domain = identifier.partition("@")
+            candidates = state.email_index.candidates(query)
+        else:
+            query, domain = identifier, ""
+            candidates = state.mssv_index.candidates(query)
+
+        best = 1
+        matches: list[int] = []
+        for rid in candidates:
+            record = records[rid]
+            if is_email:
+                local, _, record_domain = record.email.partition("@")
+                distance = _edit_distance(query, local) + (record_domain != domain)
+            else:
+                distance = _edit_distance(query, record.mssv.lower())
+            if distance < best:
+                best, matches = distance, [rid]
+            elif distance == best:
+                matches.append(rid)
+        return [records[rid] for rid in matches[:limit]]
+
+    def search_by_name(self, query: str, *, limit: int = 25) -> list[MemberRecord]:
+        """Records whose name has a word sequence starting with ``query``, ignoring case and accents."""
+        prefix = fold_name(query or "")
+        if not prefix:
+            return []
+
+        state = self._ensure_loaded()
+        seen: set[int] = set()
+        results: list[MemberRecord] = []
+        for rid in state.name_index.search(prefix):
+            if len(results) >= limit:
+                break
+            if rid not in seen:
+                seen.add(rid)
+                results.append(state.records[rid])
+        return results
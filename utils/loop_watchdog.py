@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class BlockingIncident:
+    timestamp: str
+    duration_ms: float
+    threshold_ms: float
+    stack: str
+
+
+class LoopWatchdog:
+    """Detect event loop stalls from a helper thread.
+
+    A heartbeat coroutine ticks on the loop; a daemon thread watches the
+    ticks and, once the loop has been silent longer than the threshold,
+    captures the loop thread's current stack. The incident is recorded
+    with its full duration once the loop resumes.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float = 250.0,
+        log_dir: str = "logs",
+        max_incidents: int = 100,
+    ) -> None:
+        self.threshold = threshold_ms / 1000.0
+        self.interval = max(self.threshold / 4, 0.01)
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(exist_ok=True)
+        self.incident_file = self.log_dir / "loop_blocking.jsonl"
+        self.incidents: deque[BlockingIncident] = deque(maxlen=max_incidents)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._beats = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start watching the running loop. Must be called from the loop thread."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="gauth-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 4)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            self._beats += 1
+            await asyncio.sleep(self.interval)
+
+    def _capture_loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ""
+        return "".join(traceback.format_stack(frame))
+
+    def _watch(self) -> None:
+        pending_stack: Optional[str] = None
+        pending_beats = 0
+        pending_since = 0.0
+
+        while not self._stop.wait(self.interval):
+            beats = self._beats
+            silent_for = time.monotonic() - self._last_beat
+
+            if pending_stack is not None:
+                if beats == pending_beats:
+                    continue
+                # Loop resumed: the stall lasted from the last beat before it
+                # until the first beat after it, minus the normal sleep.
+                duration = self._last_beat - pending_since - self.interval
+                self._record(duration, pending_stack)
+                pending_stack = None
+                continue
+
+            if silent_for - self.interval >= self.threshold:
+                pending_stack = self._capture_loop_stack()
+                pending_beats = beats
+                pending_since = self._last_beat
+
+    def _record(self, duration: float, stack: str) -> None:
+        incident = BlockingIncident(
+            timestamp=datetime.now().isoformat(),
+            duration_ms=round(duration * 1000, 1),
+            threshold_ms=round(self.threshold * 1000, 1),
+            stack=stack,
+        )
+        self.incidents.append(incident)
+        try:
+            with open(self.incident_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(incident), ensure_ascii=False) + "\n")
+        except OSError as exc:
+            print(f"[GAuth] Watchdog log write failed: {exc}")
+
+        last_frame = stack.strip().splitlines()[-2:] if stack else []
+        where = " ".join(line.strip() for line in last_frame) or "unknown"
+        print(f"[GAuth] Event loop blocked for {incident.duration_ms:.0f} ms at {where}")
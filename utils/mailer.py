@@ -8,20 +8,22 @@ class MailerError(RuntimeError):
     pass
 
 
-def send_otp_email(
+def mask_email(email: str) -> str:
+    local, sep, domain = email.partition("@")
+    if not sep:
+        return "*" * len(email)
+    keep = 2 if len(local) > 4 else 1
+    return f"{local[:keep]}{'*' * max(len(local) - keep, 3)}@{domain}"
+
+
+def build_otp_message(
     *,
-    smtp_host: str,
-    smtp_port: int,
     smtp_user: str,
-    smtp_pass: str,
     from_name: str,
     to_email: str,
     otp_code: str,
     full_name: str,
-) -> None:
-    if not to_email or "@" not in to_email:
-        raise MailerError("Email không hợp lệ hoặc không tồn tại trong hệ thống.")
-
+) -> MIMEText:
     subject = "USCC - Mã xác thực OTP"
     body = (
         f"Xin chào {full_name},\n\n"
@@ -33,6 +35,30 @@ def send_otp_email(
     msg["Subject"] = subject
     msg["From"] = f"{from_name} <{smtp_user}>" if from_name else smtp_user
     msg["To"] = to_email
+    return msg
+
+
+def send_otp_email(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    smtp_user: str,
+    smtp_pass: str,
+    from_name: str,
+    to_email: str,
+    otp_code: str,
+    full_name: str,
+) -> None:
+    if not to_email or "@" not in to_email:
+        raise MailerError("Email không hợp lệ hoặc không tồn tại trong hệ thống.")
+
+    msg = build_otp_message(
+        smtp_user=smtp_user,
+        from_name=from_name,
+        to_email=to_email,
+        otp_code=otp_code,
+        full_name=full_name,
+    )
 
     try:
         server = smtplib.SMTP(smtp_host, smtp_port, timeout=20)
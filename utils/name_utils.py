@@ -1,5 +1,23 @@
 from __future__ import annotations
 
+import unicodedata
+from functools import lru_cache
+
+_D_LETTERS = str.maketrans("ĐđÐð", "dddd")
+
 
 def build_nickname(full_name: str) -> str:
     return full_name.strip()
+
+
+@lru_cache(maxsize=65536)
+def _fold_word(word: str) -> str:
+    # Đ/đ (and the look-alike Ð/ð) have no decomposition, so map them by hand.
+    decomposed = unicodedata.normalize("NFD", word.translate(_D_LETTERS))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def fold_name(name: str) -> str:
+    """Lowercase ``name`` and strip Vietnamese diacritics ("Đặng Văn Ân" -> "dang van an")."""
+    # Names repeat a small set of words, so folding word by word hits the cache.
+    return " ".join(filter(None, map(_fold_word, name.split())))
@@ -18,6 +18,9 @@ class OTPStore:
     def __init__(self) -> None:
         self._by_user_id: dict[int, OTPEntry] = {}
 
+    def __len__(self) -> int:
+        return len(self._by_user_id)
+
     def set(
         self,
         user_id: int,
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import cProfile
+import gc
+import io
+import pstats
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class ProfilerError(RuntimeError):
+    pass
+
+
+class Profiler:
+    """On-demand CPU (cProfile) and memory (tracemalloc) profiling.
+
+    Reports are written under ``<log_dir>/profiles`` and the paths returned so
+    callers can attach them.
+    """
+
+    def __init__(self, log_dir: str = "logs") -> None:
+        self.profile_dir = Path(log_dir) / "profiles"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._cpu: Optional[cProfile.Profile] = None
+        self._cpu_started_at: Optional[datetime] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+
+    @property
+    def cpu_running(self) -> bool:
+        return self._cpu is not None
+
+    @property
+    def has_baseline(self) -> bool:
+        return self._baseline is not None
+
+    def _path(self, prefix: str, suffix: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return self.profile_dir / f"{prefix}-{stamp}{suffix}"
+
+    # CPU
+
+    def start_cpu(self) -> None:
+        # cProfile only traces the thread that enables it, so this must run on
+        # the event loop thread to see the handlers.
+        if self._cpu is not None:
+            raise ProfilerError("CPU profiling is already running.")
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            raise ProfilerError(f"Cannot start profiler: {exc}")
+        self._cpu = profile
+        self._cpu_started_at = datetime.now()
+
+    def stop_cpu(self) -> cProfile.Profile:
+        if self._cpu is None:
+            raise ProfilerError("CPU profiling is not running.")
+        profile = self._cpu
+        profile.disable()
+        self._cpu = None
+        return profile
+
+    def write_cpu_report(self, profile: cProfile.Profile, *, top: int = 30) -> tuple[Path, Path]:
+        raw_path = self._path("cpu", ".pstats")
+        profile.dump_stats(str(raw_path))
+
+        out = io.StringIO()
+        if self._cpu_started_at is not None:
+            elapsed = (datetime.now() - self._cpu_started_at).total_seconds()
+            out.write(f"CPU profile over {elapsed:.1f}s\n\n")
+        stats = pstats.Stats(profile, stream=out)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+
+        summary_path = self._path("cpu", ".txt")
+        summary_path.write_text(out.getvalue(), encoding="utf-8")
+        return raw_path, summary_path
+
+    # Memory
+
+    def take_baseline(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+
+    def stop_memory(self) -> None:
+        self._baseline = None
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        if self._baseline is None or not tracemalloc.is_tracing():
+            raise ProfilerError("No memory baseline. Take a baseline first.")
+        return tracemalloc.take_snapshot()
+
+    def memory_report(
+        self,
+        *,
+        type_names: Iterable[str] = (),
+        sizes: Optional[dict[str, int]] = None,
+        stop: bool = False,
+    ) -> Path:
+        """Snapshot, diff against the baseline and write the report. Blocking."""
+        snapshot = self.take_snapshot()
+        path = self.write_memory_report(snapshot, type_names=type_names, sizes=sizes)
+        if stop:
+            self.stop_memory()
+        return path
+
+    def write_memory_report(
+        self,
+        snapshot: tracemalloc.Snapshot,
+        *,
+        type_names: Iterable[str] = (),
+        sizes: Optional[dict[str, int]] = None,
+        top: int = 25,
+    ) -> Path:
+        assert self._baseline is not None
+        ignore = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+        current = snapshot.filter_traces(ignore)
+        baseline = self._baseline.filter_traces(ignore)
+
+        out = io.StringIO()
+        traced, peak = tracemalloc.get_traced_memory()
+        out.write(f"Traced memory: {traced / 1024:.1f} KiB (peak {peak / 1024:.1f} KiB)\n\n")
+
+        out.write(f"Top {top} allocation sites vs baseline:\n")
+        for stat in current.compare_to(baseline, "lineno")[:top]:
+            out.write(f"  {stat}\n")
+
+        out.write(f"\nTop {top} allocation sites (total):\n")
+        for stat in current.statistics("lineno")[:top]:
+            out.write(f"  {stat}\n")
+
+        counts = count_live_objects(type_names)
+        if counts:
+            out.write("\nLive objects:\n")
+            for name, count in counts.items():
+                out.write(f"  {name}: {count}\n")
+
+        if sizes:
+            out.write("\nStore sizes:\n")
+            for name, size in sizes.items():
+                out.write(f"  {name}: {size}\n")
+
+        path = self._path("memory", ".txt")
+        path.write_text(out.getvalue(), encoding="utf-8")
+        return path
+
+
+def count_live_objects(type_names: Iterable[str]) -> dict[str, int]:
+    wanted = set(type_names)
+    if not wanted:
+        return {}
+    counts: Counter[str] = Counter({name: 0 for name in wanted})
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in wanted:
+            counts[name] += 1
+    return dict(sorted(counts.items()))